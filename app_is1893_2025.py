@@ -1,11 +1,11 @@
 import streamlit as st
 import pandas as pd
-import math
-import matplotlib.pyplot as plt
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, Image
-from reportlab.lib.styles import getSampleStyleSheet
-from openpyxl import load_workbook
-from openpyxl.chart import LineChart, Reference
+import numpy as np
+import io
+from seismic_core import (
+    ZONES, TRS, SITES, Z_ARR, ZONE_INDEX, TR_INDEX,
+    A_NH_vec, periods, compute_base_shear, distribute
+)
 
 # ==================================================
 # PAGE CONFIG
@@ -22,17 +22,6 @@ st.caption(
     "**Created by: Vrushali Kamalakar**"
 )
 
-# ==================================================
-# Z TABLE (IS 1893:2025)
-# ==================================================
-Z_TABLE = {
-    "VI": {75:0.300,175:0.375,275:0.450,475:0.500,975:0.600,1275:0.625,2475:0.750,4975:0.940,9975:1.125},
-    "V":  {75:0.200,175:0.250,275:0.300,475:0.333,975:0.400,1275:0.4167,2475:0.500,4975:0.625,9975:0.750},
-    "IV": {75:0.140,175:0.175,275:0.210,475:0.233,975:0.280,1275:0.2917,2475:0.350,4975:0.440,9975:0.525},
-    "III":{75:0.0625,175:0.085,275:0.100,475:0.125,975:0.167,1275:0.1875,2475:0.250,4975:0.333,9975:0.450},
-    "II": {75:0.0375,175:0.050,275:0.060,475:0.075,975:0.100,1275:0.1125,2475:0.150,4975:0.200,9975:0.270}
-}
-
 # ==================================================
 # SESSION STATE
 # ==================================================
@@ -40,24 +29,165 @@ if "base_shear" not in st.session_state:
     st.session_state.base_shear = {}
 if "multi_zone_df" not in st.session_state:
     st.session_state.multi_zone_df = None
+if "multi_zone_png" not in st.session_state:
+    st.session_state.multi_zone_png = None
 
 # ==================================================
 # FUNCTIONS
 # ==================================================
-def A_NH(T, site):
-    if site == "A/B":
-        return 2.5 if T <= 0.4 else (1/T if T <= 6 else 6/T**2)
-    if site == "C":
-        return 2.5 if T <= 0.6 else (1.5/T if T <= 6 else 9/T**2)
-    return 2.5 if T <= 0.8 else (2/T if T <= 6 else 12/T**2)
-
-def delta_v(T, site):
-    if T > 0.10:
-        return 0.67
-    return {"A/B":0.80, "C":0.82, "D":0.85}[site]
-
-def gamma_v(T, site):
-    return {"A/B":1/T, "C":1.5/T, "D":2.0/T}[site]
+def fmt3(df):
+    # Display float columns to 3 decimals without copying the frame
+    return {c: st.column_config.NumberColumn(format="%.3f") for c in df.select_dtypes("float").columns}
+
+# Plotting / PDF libraries are imported on first use to keep cold start short
+@st.cache_resource
+def _plt():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+@st.cache_resource
+def _styles():
+    from reportlab.lib.styles import getSampleStyleSheet
+    return getSampleStyleSheet()
+
+@st.cache_data(max_entries=1024)
+def compute_storey(Wi, Hi, Vx, Vy, Vv):
+    Wi = np.asarray(Wi, dtype=float)
+    Hi = np.asarray(Hi, dtype=float)
+    WH2, QX, QY, QV, VX, VY, VV = distribute(Wi, Hi, Vx, Vy, Vv)
+
+    return pd.DataFrame({
+        "Storey": np.arange(1, len(Wi) + 1),
+        "Wi (kN)": Wi,
+        "Hi (m)": Hi,
+        "WiHi²": WH2,
+        "QDi,X": QX,
+        "QDi,Y": QY,
+        "QDi,V": QV,
+        "VDi,X": VX,
+        "VDi,Y": VY,
+        "VDi,V": VV
+    })
+
+@st.cache_data(max_entries=64)
+def storey_shear_png(df, direction):
+    plt = _plt()
+    fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(15, 4))
+
+    # 1️⃣ Horizontal storey shear (selected direction)
+    shear_col = "VDi,X" if direction == "X" else "VDi,Y"
+    ax1.plot(df[shear_col], df["Hi (m)"], marker="o")
+    ax1.set_xlabel("Storey Shear (kN)")
+    ax1.set_ylabel("Height (m)")
+    ax1.set_title(f"Storey Shear – {direction} Direction")
+    ax1.grid(True)
+
+    # 2️⃣ Vertical storey shear
+    ax2.plot(df["VDi,V"], df["Hi (m)"], marker="s", color="black")
+    ax2.set_xlabel("Vertical Shear (kN)")
+    ax2.set_ylabel("Height (m)")
+    ax2.set_title("Vertical Storey Shear")
+    ax2.grid(True)
+
+    # 3️⃣ Combined X & Y overlay
+    ax3.plot(df["VDi,X"], df["Hi (m)"], marker="o", label="X-direction")
+    ax3.plot(df["VDi,Y"], df["Hi (m)"], marker="s", label="Y-direction")
+    ax3.set_xlabel("Storey Shear (kN)")
+    ax3.set_ylabel("Height (m)")
+    ax3.set_title("Combined Storey Shear – X & Y")
+    ax3.legend()
+    ax3.grid(True)
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=150)
+    plt.close(fig)
+    return buf.getvalue()
+
+@st.cache_data(max_entries=64)
+def zone_chart_png(zones, Vx, Vy):
+    plt = _plt()
+    fig, ax = plt.subplots()
+    ax.plot(zones, Vx, marker="o", label="X direction")
+    ax.plot(zones, Vy, marker="s", label="Y direction")
+    ax.set_xlabel("Seismic Zone")
+    ax.set_ylabel("Base Shear (kN)")
+    ax.set_title("Base Shear vs Seismic Zone")
+    ax.grid(True)
+    ax.legend()
+
+    # 150 dpi (960x720 px) is sharp on screen and still ~170 dpi at the PDF's 400x250 pt
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=150)
+    plt.close(fig)
+    return buf.getvalue()
+
+@st.cache_data(max_entries=1024)
+def compute_multizone(zones, TR, I, R, site, W, H, dx, dy):
+    Tx, Ty = periods(H, dx, dy)
+
+    # A_NH does not depend on the zone, so evaluate it once per direction
+    Z_arr = Z_ARR[[ZONE_INDEX[z] for z in zones], TR_INDEX[TR]]
+    anhx, anhy = A_NH_vec((Tx, Ty), site)
+    k = I / R * W
+
+    return pd.DataFrame({
+        "Zone": zones,
+        "Z": Z_arr,
+        "Vx (kN)": Z_arr * (k * anhx),
+        "Vy (kN)": Z_arr * (k * anhy)
+    })
+
+@st.cache_data(max_entries=64)
+def build_excel_bytes(dfz):
+    buf=io.BytesIO()
+    with pd.ExcelWriter(buf, engine="xlsxwriter") as writer:
+        dfz.to_excel(writer, index=False, sheet_name="Sheet1")
+        ws=writer.sheets["Sheet1"]
+        n=len(dfz)
+
+        chart=writer.book.add_chart({"type":"line"})
+        for col in (2,3):
+            chart.add_series({
+                "name":["Sheet1",0,col],
+                "categories":["Sheet1",1,0,n,0],
+                "values":["Sheet1",1,col,n,col]
+            })
+        chart.set_title({"name":"Base Shear vs Zone"})
+        chart.set_y_axis({"name":"Base Shear (kN)"})
+        chart.set_x_axis({"name":"Zone"})
+        ws.insert_chart("G2",chart)
+    return buf.getvalue()
+
+PDF_TABLE_ROWS = 40
+
+@st.cache_data(max_entries=64)
+def build_pdf_bytes(dfz, png):
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, Image
+
+    # Page-sized table chunks keep ReportLab's split search bounded
+    header=dfz.columns.tolist()
+    text=dfz.copy()
+    for c in dfz.select_dtypes("number").columns:
+        text[c]=np.char.mod("%.3f", dfz[c].to_numpy())
+    rows=text.values.tolist()
+    tables=[
+        Table([header]+rows[i:i+PDF_TABLE_ROWS], repeatRows=1)
+        for i in range(0, max(len(rows),1), PDF_TABLE_ROWS)
+    ]
+
+    buf=io.BytesIO()
+    doc=SimpleDocTemplate(buf)
+    styles=_styles()
+    content=[
+        Paragraph("IS 1893:2025 – Multi-Zone Base Shear Study", styles["Title"]),
+        Paragraph("For educational use only<br/>Created by: Vrushali Kamalakar", styles["Normal"]),
+        *tables,
+        Image(io.BytesIO(png), width=400, height=250)
+    ]
+    doc.build(content)
+    return buf.getvalue()
 
 # ==================================================
 # TABS
@@ -74,27 +204,25 @@ tab1, tab2, tab3 = st.tabs([
 with tab1:
     st.subheader("Direction-wise Base Shear Calculation")
 
-    zone = st.selectbox("Earthquake Zone", ["II","III","IV","V","VI"])
-    TR = st.selectbox("Return Period TR (years)", [75,175,275,475,975,1275,2475,4975,9975])
-    Z = Z_TABLE[zone][TR]
+    # Inputs are batched in a form: one rerun per submit, not per edit
+    with st.form("base_shear_inputs"):
+        zone = st.selectbox("Earthquake Zone", ZONES)
+        TR = st.selectbox("Return Period TR (years)", TRS)
 
-    I = st.number_input("Importance Factor (I)", value=1.0)
-    R = st.number_input("Response Reduction Factor (R)", value=5.0)
-    site = st.selectbox("Site Class", ["A/B","C","D"])
-    W = st.number_input("Total Seismic Weight W (kN)", value=10000.0)
+        I = st.number_input("Importance Factor (I)", value=1.0)
+        R = st.number_input("Response Reduction Factor (R)", value=5.0)
+        site = st.selectbox("Site Class", SITES)
+        W = st.number_input("Total Seismic Weight W (kN)", value=10000.0)
 
-    H = st.number_input("Total Height H (m)", value=15.0)
-    dx = st.number_input("Plan Dimension dx (m)", value=10.0)
-    dy = st.number_input("Plan Dimension dy (m)", value=15.0)
-    TV = st.number_input("Vertical Period TV (s)", value=0.4)
+        H = st.number_input("Total Height H (m)", value=15.0)
+        dx = st.number_input("Plan Dimension dx (m)", value=10.0)
+        dy = st.number_input("Plan Dimension dy (m)", value=15.0)
+        TV = st.number_input("Vertical Period TV (s)", value=0.4)
 
-    if st.button("Compute Base Shear"):
-        Tx = 0.09 * H / math.sqrt(dx)
-        Ty = 0.09 * H / math.sqrt(dy)
+        submitted = st.form_submit_button("Compute Base Shear")
 
-        Vx = (Z * I * A_NH(Tx, site) / R) * W
-        Vy = (Z * I * A_NH(Ty, site) / R) * W
-        Vv = Z * I * delta_v(TV, site) * gamma_v(TV, site) * W
+    if submitted:
+        Z, Tx, Ty, Vx, Vy, Vv = compute_base_shear(zone, TR, I, R, site, W, H, dx, dy, TV)
 
         st.session_state.base_shear = {
             "Zone":zone,"TR":TR,"Z":Z,
@@ -115,7 +243,9 @@ with tab1:
 # ==================================================
 # TAB 2 – STOREY DISTRIBUTION + PLOTS
 # ==================================================
-with tab2:
+# Fragment: edits in this tab rerun only this tab, not the whole script
+@st.fragment
+def storey_tab():
     st.subheader("Storey-wise Seismic Force Distribution")
 
     if not st.session_state.base_shear:
@@ -127,15 +257,8 @@ with tab2:
             key="storey_dir"
         )
 
-        Vh = (
-            st.session_state.base_shear["Vx"]
-            if direction == "X"
-            else st.session_state.base_shear["Vy"]
-        )
-        Vx = st.session_state.base_shear["Vx"]
-        Vy = st.session_state.base_shear["Vy"]
-        Vv = st.session_state.base_shear["Vv"]
-        W  = st.session_state.base_shear["W"]
+        bs = st.session_state.base_shear
+        Vx, Vy, Vv, W = bs["Vx"], bs["Vy"], bs["Vv"], bs["W"]
 
         N = st.number_input(
             "Number of Storeys",
@@ -145,34 +268,41 @@ with tab2:
             key="num_storeys"
         )
 
-        rows = []
-        for i in range(1, N + 1):
-            Wi = st.number_input(
-                f"W{i} (kN)",
-                value=W / N,
-                key=f"Wi_{i}"
-            )
-            Hi = st.number_input(
-                f"H{i} (m)",
-                value=3.0 * i,
-                key=f"Hi_{i}"
+        # One editable grid instead of 2N number_input widgets
+        storeys = np.arange(1, N + 1)
+        default_df = pd.DataFrame({
+            "Storey": storeys,
+            "Wi (kN)": np.full(N, W / N),
+            "Hi (m)": 3.0 * storeys
+        })
+        # Edits are batched by the form and only applied on submit
+        with st.form("storey_inputs"):
+            df = st.data_editor(
+                default_df,
+                num_rows="fixed",
+                disabled=["Storey"],
+                column_config={
+                    "Wi (kN)": st.column_config.NumberColumn(format="%.2f", min_value=0.0, required=True),
+                    "Hi (m)": st.column_config.NumberColumn(format="%.2f", min_value=0.0, required=True)
+                },
+                hide_index=True,
+                key=f"storey_grid_{N}"
             )
-            rows.append([i, Wi, Hi])
+            st.form_submit_button("Update Distribution")
 
-        df = pd.DataFrame(rows, columns=["Storey", "Wi (kN)", "Hi (m)"])
+        # Cleared cells or a zero ΣWi·Hi² / ΣWi denominator would turn every force into NaN
+        Wi = df["Wi (kN)"].to_numpy(dtype=float)
+        Hi = df["Hi (m)"].to_numpy(dtype=float)
+        if np.isnan(Wi).any() or np.isnan(Hi).any() or not ((Wi * Hi * Hi).sum() > 0 and Wi.sum() > 0):
+            st.error("Enter Wi and Hi for every storey; at least one storey needs both Wi and Hi above zero.")
+            return
 
         # ---------------- DISTRIBUTION ----------------
-        df["WiHi²"] = df["Wi (kN)"] * df["Hi (m)"] ** 2
-
-        df["QDi,X"] = df["WiHi²"] / df["WiHi²"].sum() * Vx
-        df["QDi,Y"] = df["WiHi²"] / df["WiHi²"].sum() * Vy
-        df["QDi,V"] = df["Wi (kN)"] / df["Wi (kN)"].sum() * Vv
-
-        df["VDi,X"] = df["QDi,X"][::-1].cumsum()[::-1]
-        df["VDi,Y"] = df["QDi,Y"][::-1].cumsum()[::-1]
-        df["VDi,V"] = df["QDi,V"][::-1].cumsum()[::-1]
+        df = compute_storey(
+            tuple(df["Wi (kN)"]), tuple(df["Hi (m)"]), Vx, Vy, Vv
+        )
 
-        st.dataframe(df.round(3), use_container_width=True)
+        st.dataframe(df, column_config=fmt3(df), width="stretch")
 
         # Save for export
         st.session_state.storey_df = df
@@ -180,38 +310,10 @@ with tab2:
         # ---------------- STOREY SHEAR PLOTS ----------------
         st.markdown("### Storey Shear Diagrams (Height-based)")
 
-        # 1️⃣ Horizontal storey shear (selected direction)
-        fig1, ax1 = plt.subplots()
-        shear_col = "VDi,X" if direction == "X" else "VDi,Y"
-        ax1.plot(df[shear_col], df["Hi (m)"], marker="o")
-        ax1.set_xlabel("Storey Shear (kN)")
-        ax1.set_ylabel("Height (m)")
-        ax1.set_title(f"Storey Shear – {direction} Direction")
-        ax1.grid(True)
-        st.pyplot(fig1)
-        fig1.savefig(f"storey_shear_{direction}.png", dpi=300)
-
-        # 2️⃣ Vertical storey shear
-        fig2, ax2 = plt.subplots()
-        ax2.plot(df["VDi,V"], df["Hi (m)"], marker="s", color="black")
-        ax2.set_xlabel("Vertical Shear (kN)")
-        ax2.set_ylabel("Height (m)")
-        ax2.set_title("Vertical Storey Shear")
-        ax2.grid(True)
-        st.pyplot(fig2)
-        fig2.savefig("storey_shear_vertical.png", dpi=300)
+        st.image(storey_shear_png(df, direction), width="stretch")
 
-        # 3️⃣ Combined X & Y overlay
-        fig3, ax3 = plt.subplots()
-        ax3.plot(df["VDi,X"], df["Hi (m)"], marker="o", label="X-direction")
-        ax3.plot(df["VDi,Y"], df["Hi (m)"], marker="s", label="Y-direction")
-        ax3.set_xlabel("Storey Shear (kN)")
-        ax3.set_ylabel("Height (m)")
-        ax3.set_title("Combined Storey Shear – X & Y")
-        ax3.legend()
-        ax3.grid(True)
-        st.pyplot(fig3)
-        fig3.savefig("storey_shear_XY.png", dpi=300)
+with tab2:
+    storey_tab()
 
 
 
@@ -221,81 +323,58 @@ with tab2:
 # ==================================================
 # TAB 3 – MULTI-ZONE STUDY + EXPORT
 # ==================================================
-with tab3:
+@st.fragment
+def multi_zone_tab():
     st.subheader("Multi-Zone Base Shear Comparison")
 
-    zones = st.multiselect("Select Zones", ["II","III","IV","V","VI"], default=["II","III","IV","V"])
-    TR = st.selectbox("Return Period (years)", [75,175,275,475,975,1275,2475,4975,9975], key="mz_tr")
-    I = st.number_input("Importance Factor", value=1.0, key="mz_I")
-    R = st.number_input("Response Reduction Factor", value=5.0, key="mz_R")
-    site = st.selectbox("Site Class", ["A/B","C","D"], key="mz_site")
-    W = st.number_input("Total Weight W (kN)", value=10000.0, key="mz_W")
-    H = st.number_input("Height H (m)", value=15.0, key="mz_H")
-    dx = st.number_input("dx (m)", value=10.0, key="mz_dx")
-    dy = st.number_input("dy (m)", value=15.0, key="mz_dy")
-
-    if st.button("Compute Multi-Zone Base Shear"):
-        Tx = 0.09 * H / math.sqrt(dx)
-        Ty = 0.09 * H / math.sqrt(dy)
-
-        data=[]
-        for z in zones:
-            Z = Z_TABLE[z][TR]
-            data.append([z,Z,(Z*I*A_NH(Tx,site)/R)*W,(Z*I*A_NH(Ty,site)/R)*W])
-
-        dfz = pd.DataFrame(data, columns=["Zone","Z","Vx (kN)","Vy (kN)"])
+    with st.form("multi_zone_inputs"):
+        zones = st.multiselect("Select Zones", ZONES, default=ZONES[:4])
+        TR = st.selectbox("Return Period (years)", TRS, key="mz_tr")
+        I = st.number_input("Importance Factor", value=1.0, key="mz_I")
+        R = st.number_input("Response Reduction Factor", value=5.0, key="mz_R")
+        site = st.selectbox("Site Class", SITES, key="mz_site")
+        W = st.number_input("Total Weight W (kN)", value=10000.0, key="mz_W")
+        H = st.number_input("Height H (m)", value=15.0, key="mz_H")
+        dx = st.number_input("dx (m)", value=10.0, key="mz_dx")
+        dy = st.number_input("dy (m)", value=15.0, key="mz_dy")
+
+        submitted = st.form_submit_button("Compute Multi-Zone Base Shear")
+
+    if submitted:
+        dfz = compute_multizone(tuple(zones), TR, I, R, site, W, H, dx, dy)
         st.session_state.multi_zone_df = dfz
 
-        st.dataframe(dfz.round(3), use_container_width=True)
-
-        fig, ax = plt.subplots()
-        ax.plot(dfz["Zone"], dfz["Vx (kN)"], marker="o", label="X direction")
-        ax.plot(dfz["Zone"], dfz["Vy (kN)"], marker="s", label="Y direction")
-        ax.set_xlabel("Seismic Zone")
-        ax.set_ylabel("Base Shear (kN)")
-        ax.set_title("Base Shear vs Seismic Zone")
-        ax.grid(True)
-        ax.legend()
-        st.pyplot(fig)
+        st.dataframe(dfz, column_config=fmt3(dfz), width="stretch")
 
-        fig.savefig("base_shear_zone.png", dpi=300)
+        png = zone_chart_png(tuple(dfz["Zone"]), tuple(dfz["Vx (kN)"]), tuple(dfz["Vy (kN)"]))
+        st.session_state.multi_zone_png = png
+        st.image(png, width="stretch")
 
     # ---------------- EXPORT ----------------
     if st.session_state.multi_zone_df is not None:
         dfz = st.session_state.multi_zone_df
 
-        # Excel
+        # Files are generated only when a download button is clicked
+        png = st.session_state.multi_zone_png
+
         excel_file="IS1893_2025_BaseShear_MultiZone.xlsx"
-        dfz.to_excel(excel_file,index=False)
-        wb=load_workbook(excel_file)
-        ws=wb.active
-
-        chart=LineChart()
-        chart.title="Base Shear vs Zone"
-        chart.y_axis.title="Base Shear (kN)"
-        chart.x_axis.title="Zone"
-        data=Reference(ws,min_col=3,min_row=1,max_col=4,max_row=ws.max_row)
-        cats=Reference(ws,min_col=1,min_row=2,max_row=ws.max_row)
-        chart.add_data(data,titles_from_data=True)
-        chart.set_categories(cats)
-        ws.add_chart(chart,"G2")
-        wb.save(excel_file)
-
-        st.download_button("Download Excel (with graph)", open(excel_file,"rb"), file_name=excel_file)
-
-        # PDF
+        st.download_button(
+            "Download Excel (with graph)",
+            lambda: build_excel_bytes(dfz),
+            file_name=excel_file,
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+
         pdf_file="IS1893_2025_BaseShear_MultiZone.pdf"
-        doc=SimpleDocTemplate(pdf_file)
-        styles=getSampleStyleSheet()
-        content=[
-            Paragraph("IS 1893:2025 – Multi-Zone Base Shear Study", styles["Title"]),
-            Paragraph("For educational use only<br/>Created by: Vrushali Kamalakar", styles["Normal"]),
-            Table([dfz.columns.tolist()]+dfz.round(3).values.tolist()),
-            Image("base_shear_zone.png", width=400, height=250)
-        ]
-        doc.build(content)
-
-        st.download_button("Download PDF (with graph)", open(pdf_file,"rb"), file_name=pdf_file)
+        st.download_button(
+            "Download PDF (with graph)",
+            lambda: build_pdf_bytes(dfz, png),
+            file_name=pdf_file,
+            mime="application/pdf"
+        )
+
+with tab3:
+    multi_zone_tab()
 
 # ==================================================
 # FOOTER
@@ -0,0 +1,97 @@
+import numpy as np
+import math
+from functools import lru_cache
+from types import MappingProxyType
+
+# Pure IS 1893:2025 numerics shared by the Streamlit app.
+# Streamlit re-executes the app script on every rerun, but an imported module
+# runs once per process: the tables below are built once and the lru_caches
+# persist across reruns and sessions.
+
+# ==================================================
+# Z TABLE (IS 1893:2025)
+# ==================================================
+ZONES = ("II","III","IV","V","VI")
+TRS = (75,175,275,475,975,1275,2475,4975,9975)
+SITES = ("A/B","C","D")
+
+Z_TABLE = MappingProxyType({z: MappingProxyType(row) for z, row in {
+    "VI": {75:0.300,175:0.375,275:0.450,475:0.500,975:0.600,1275:0.625,2475:0.750,4975:0.940,9975:1.125},
+    "V":  {75:0.200,175:0.250,275:0.300,475:0.333,975:0.400,1275:0.4167,2475:0.500,4975:0.625,9975:0.750},
+    "IV": {75:0.140,175:0.175,275:0.210,475:0.233,975:0.280,1275:0.2917,2475:0.350,4975:0.440,9975:0.525},
+    "III":{75:0.0625,175:0.085,275:0.100,475:0.125,975:0.167,1275:0.1875,2475:0.250,4975:0.333,9975:0.450},
+    "II": {75:0.0375,175:0.050,275:0.060,475:0.075,975:0.100,1275:0.1125,2475:0.150,4975:0.200,9975:0.270}
+}.items()})
+
+# Z_ARR[ZONE_INDEX[zone], TR_INDEX[TR]] – same values as Z_TABLE, as one 2-D array
+Z_ARR = np.array([[Z_TABLE[z][tr] for tr in TRS] for z in ZONES])
+Z_ARR.setflags(write=False)
+ZONE_INDEX = {z: i for i, z in enumerate(ZONES)}
+TR_INDEX = {tr: j for j, tr in enumerate(TRS)}
+
+# ==================================================
+# SPECTRUM
+# ==================================================
+# A_NH breakpoints per site class: 2.5 up to Tc, k1/T up to 6 s, k2/T² beyond
+SITE_PARAMS = {"A/B":(0.4,1.0,6.0), "C":(0.6,1.5,9.0), "D":(0.8,2.0,12.0)}
+
+@lru_cache(maxsize=256)
+def A_NH(T, site):
+    Tc, k1, k2 = SITE_PARAMS[site]
+    return 2.5 if T <= Tc else (k1/T if T <= 6 else k2/(T*T))
+
+def A_NH_vec(T, site):
+    # Branchless twin of A_NH for arrays of periods
+    Tc, k1, k2 = SITE_PARAMS[site]
+    T = np.asarray(T, dtype=float)
+    with np.errstate(divide="ignore"):
+        return np.where(T <= Tc, 2.5, np.where(T <= 6, k1/T, k2/np.square(T)))
+
+# Vertical spectrum: short-period delta_v and gamma_v numerator per site class
+DELTA_V = {"A/B":0.80, "C":0.82, "D":0.85}
+GAMMA_V = {"A/B":1.0, "C":1.5, "D":2.0}
+
+@lru_cache(maxsize=256)
+def delta_v(T, site):
+    if T > 0.10:
+        return 0.67
+    return DELTA_V[site]
+
+@lru_cache(maxsize=256)
+def gamma_v(T, site):
+    return GAMMA_V[site] / T
+
+# ==================================================
+# BASE SHEAR + DISTRIBUTION
+# ==================================================
+@lru_cache(maxsize=256)
+def periods(H, dx, dy):
+    # Approximate fundamental periods Tx, Ty = 0.09 H / sqrt(d)
+    k = 0.09 * H
+    return k / math.sqrt(dx), k / math.sqrt(dy)
+
+def compute_base_shear(zone, TR, I, R, site, W, H, dx, dy, TV):
+    Z = float(Z_ARR[ZONE_INDEX[zone], TR_INDEX[TR]])
+    Tx, Ty = periods(H, dx, dy)
+
+    kV = Z * I * W
+    kH = kV / R
+    Vx = kH * A_NH(Tx, site)
+    Vy = kH * A_NH(Ty, site)
+    Vv = kV * delta_v(TV, site) * gamma_v(TV, site)
+    return Z, Tx, Ty, Vx, Vy, Vv
+
+def rev_cumsum(a):
+    # Storey shear: sum of the storey forces at and above each level
+    return np.cumsum(a[::-1])[::-1]
+
+def distribute(Wi, Hi, Vx, Vy, Vv):
+    # Storey forces (Wi·Hi² for horizontal, Wi for vertical) and storey shears
+    WH2 = Wi * Hi * Hi
+    s = WH2.sum()
+    sw = Wi.sum()
+
+    QX = WH2 / s * Vx
+    QY = WH2 / s * Vy
+    QV = Wi / sw * Vv
+    return WH2, QX, QY, QV, rev_cumsum(QX), rev_cumsum(QY), rev_cumsum(QV)